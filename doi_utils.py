@@ -3,23 +3,32 @@ DOI validation and cleaning utilities for the literature research pipeline.
 Handles malformed DOIs from Google Scholar and other sources.
 """
 import re
-from typing import Optional
+from typing import Iterable, List, Optional
 
 # Official DOI regex pattern
 # Format: 10.{registrant}/{suffix}
 # Registrant: 4-9 digits
 # Suffix: any character except whitespace
 DOI_PATTERN = re.compile(
-    r'^10\.\d{4,9}/[^\s]+$',
+    r'^10\.\d{4,9}/\S+$',
     re.IGNORECASE
 )
 
 # Common DOI prefixes to detect DOIs in text
 DOI_PREFIX_PATTERN = re.compile(
-    r'10\.\d{4,9}/[^\s]+',
+    r'10\.\d{4,9}/\S+',
     re.IGNORECASE
 )
 
+# Cleanup patterns used by clean_doi, compiled once at import time
+_PREFIX_RE = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:)', re.IGNORECASE)
+_QUERY_RE = re.compile(r'[&?]')
+_TRAIL_FRAG_RE = re.compile(r'/\d{6,8}\Z')
+
+# Subset of DOI_PATTERN that clean_doi leaves unchanged: no query
+# characters and no trailing punctuation (trailing fragments checked separately)
+_CANONICAL_DOI_RE = re.compile(r'^10\.\d{4,9}/[^\s&?]*[^\s&?.,;:)]\Z')
+
 
 def extract_doi(text: str) -> Optional[str]:
     """
@@ -66,22 +75,13 @@ def clean_doi(doi: str) -> Optional[str]:
     
     doi = doi.strip()
     
-    # Remove common URL prefixes
-    prefixes = [
-        'https://doi.org/',
-        'http://doi.org/',
-        'https://dx.doi.org/',
-        'http://dx.doi.org/',
-        'doi:',
-        'DOI:',
-    ]
-    for prefix in prefixes:
-        if doi.lower().startswith(prefix.lower()):
-            doi = doi[len(prefix):]
-            break
+    # Remove common URL prefixes (https://doi.org/, dx.doi.org/, doi:, ...);
+    # bare DOIs cannot carry one, so they skip the regex entirely
+    if not doi.startswith('10.'):
+        doi = _PREFIX_RE.sub('', doi)
     
     # Remove URL query parameters (&..., ?...)
-    doi = re.split(r'[&?]', doi)[0]
+    doi = _QUERY_RE.split(doi, 1)[0]
     
     # Remove HTML entities
     doi = doi.replace('&amp;', '&')
@@ -97,12 +97,7 @@ def clean_doi(doi: str) -> Optional[str]:
     # - All digits
     # - Short (6-8 chars) - likely a URL path fragment
     # - OR matches known bad patterns
-    parts = doi.rsplit('/', 1)
-    if len(parts) == 2 and parts[1].isdigit():
-        suffix_len = len(parts[1])
-        # Remove only SHORT numeric fragments (6-8 chars), not long valid DOI suffixes
-        if 6 <= suffix_len <= 8:
-            doi = parts[0]
+    doi = _TRAIL_FRAG_RE.sub('', doi)
     
     return doi if doi else None
 
@@ -115,6 +110,9 @@ def is_valid_doi(doi: str) -> bool:
     - Registrant: 4-9 digits
     - Suffix: any non-whitespace characters
     
+    Matches against the precompiled module-level DOI_PATTERN; the fast path
+    in normalize_doi relies on _CANONICAL_DOI_RE accepting a subset of it.
+    
     Examples:
         >>> is_valid_doi("10.1234/example")
         True
@@ -129,6 +127,18 @@ def is_valid_doi(doi: str) -> bool:
     return bool(DOI_PATTERN.match(doi.strip()))
 
 
+def is_valid_doi_batch(dois: Iterable[str]) -> List[bool]:
+    """
+    Validate many DOI strings at once, same rules as is_valid_doi.
+    
+    Examples:
+        >>> is_valid_doi_batch(["10.1234/example", "", "not-a-doi"])
+        [True, False, False]
+    """
+    match = DOI_PATTERN.match
+    return [bool(doi and match(doi.strip())) for doi in dois]
+
+
 def normalize_doi(doi: str) -> Optional[str]:
     """
     Full normalization: extract → clean → validate.
@@ -140,8 +150,14 @@ def normalize_doi(doi: str) -> Optional[str]:
         >>> normalize_doi("invalid")
         None
     """
+    doi = doi.strip() if doi else ''
+    
+    # Fast path: already-canonical DOIs (the common Scholar case) need no cleanup
+    if doi.startswith('10.') and _CANONICAL_DOI_RE.match(doi) and not _TRAIL_FRAG_RE.search(doi):
+        return doi
+    
     # Try to extract if it's embedded in text
-    extracted = extract_doi(doi) if not doi.strip().startswith('10.') else doi
+    extracted = extract_doi(doi) if not doi.startswith('10.') else doi
     
     # Clean it
     cleaned = clean_doi(extracted or doi)
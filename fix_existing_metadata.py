@@ -5,10 +5,11 @@ Re-scrapes Google Scholar and updates Zotero items.
 """
 import json
 import logging
-import requests
+import re
 import sys
 from pathlib import Path
 from scholar_search import search_scholar
+from zotero_client import WRITE_BATCH_SIZE, build_session, iter_collection_items, update_items
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 LOGGER = logging.getLogger(__name__)
@@ -17,25 +18,20 @@ CONFIG_PATH = Path("~/.openclaw/workspace/.zotero-config.json").expanduser()
 GROUP_ID = "5120604"
 COLLECTION_KEY = "UV4I5VWV"
 
+# Bad author names: just numbers (e.g. a year), truncated text, or a publication separator
+_BAD_AUTHOR_RE = re.compile(r'^\s*\d+\s*$|…| - ')
+
 
 def load_config():
     with open(CONFIG_PATH) as f:
         return json.load(f)
 
 
-def get_collection_items(api_key):
-    """Fetch all items in the collection"""
-    url = f"https://api.zotero.org/groups/{GROUP_ID}/collections/{COLLECTION_KEY}/items?limit=100"
-    response = requests.get(url, headers={"Zotero-API-Key": api_key})
-    response.raise_for_status()
-    return response.json()
-
-
 def _author_creators(authors):
     """Convert list of author name strings to Zotero creator objects"""
     creators = []
     for author in authors:
-        parts = [p for p in author.strip().split(" ") if p]
+        parts = author.split()
         if len(parts) == 1:
             creators.append({"creatorType": "author", "name": parts[0]})
         elif len(parts) > 1:
@@ -47,24 +43,19 @@ def _author_creators(authors):
     return creators
 
 
-def update_item(api_key, item_key, item_data, version):
-    """Update a Zotero item"""
-    url = f"https://api.zotero.org/groups/{GROUP_ID}/items/{item_key}"
-    response = requests.patch(
-        url,
-        headers={
-            "Zotero-API-Key": api_key,
-            "Content-Type": "application/json",
-            "If-Unmodified-Since-Version": str(version)
-        },
-        json=item_data
-    )
+def flush_updates(session, api_key, pending):
+    """Write queued item updates in one batch; returns (fixed, failed) counts"""
+    if not pending:
+        return 0, 0
     
-    if response.status_code == 204:
-        return True
-    else:
-        LOGGER.error(f"Failed to update {item_key}: {response.status_code} - {response.text}")
-        return False
+    results = update_items(session, api_key, GROUP_ID, pending)
+    fixed = 0
+    for item_key, ok in results.items():
+        if ok:
+            LOGGER.info(f"  ✅ Updated {item_key}")
+            fixed += 1
+    pending.clear()
+    return fixed, len(results) - fixed
 
 
 def main():
@@ -72,77 +63,84 @@ def main():
     api_key = config["api_key"]
     
     LOGGER.info("Fetching all items from collection...")
-    items = get_collection_items(api_key)
-    LOGGER.info(f"Found {len(items)} items")
+    session = build_session()
     
+    item_count = 0
     fixed_count = 0
     skipped_count = 0
     failed_count = 0
+    pending_updates = []
     
-    for item in items:
-        data = item["data"]
-        key = data["key"]
-        version = data["version"]
-        title = data.get("title", "")
-        creators = data.get("creators", [])
-        
-        # Check if authors are missing/broken
-        has_valid_authors = True
-        
-        if not creators:
-            has_valid_authors = False
-        else:
-            # Check for obviously bad author data
-            for creator in creators:
-                author_name = creator.get("lastName", "") + creator.get("firstName", "") + creator.get("name", "")
-                
-                # Bad if: just numbers, contains "…", contains " - ", looks like a year
-                if (
-                    not author_name.strip() or  # Empty
-                    author_name.strip().isdigit() or  # Just numbers (e.g., "2026")
-                    "…" in author_name or  # Truncated text
-                    " - " in author_name or  # Contains publication separator
-                    len(author_name.strip()) > 100  # Suspiciously long
-                ):
-                    has_valid_authors = False
-                    break
-        
-        if has_valid_authors:
-            LOGGER.info(f"✓ {key}: Already has valid authors, skipping")
-            skipped_count += 1
-            continue
-        
-        LOGGER.info(f"🔧 {key}: Missing authors, re-scraping Scholar for: {title[:60]}...")
-        
-        # Search Scholar for this title
-        results = search_scholar(title, max_results=1)
-        
-        if not results:
-            LOGGER.warning(f"  ⚠️  No Scholar results found for: {title}")
-            failed_count += 1
-            continue
-        
-        # Use first result
-        paper = results[0]
-        new_authors = _author_creators(paper.get("authors", []))
-        
-        if not new_authors:
-            LOGGER.warning(f"  ⚠️  No authors found in Scholar result")
-            failed_count += 1
-            continue
-        
-        LOGGER.info(f"  Found {len(new_authors)} authors: {[a.get('lastName', a.get('name')) for a in new_authors]}")
-        
-        # Update item
-        data["creators"] = new_authors
-        
-        if update_item(api_key, key, data, version):
-            LOGGER.info(f"  ✅ Updated {key}")
-            fixed_count += 1
-        else:
-            failed_count += 1
+    # Items stream in page by page, so processing starts before the whole collection is fetched;
+    # queued fixes are written even if the run is interrupted part-way
+    try:
+        for item in iter_collection_items(session, api_key, GROUP_ID, COLLECTION_KEY):
+            item_count += 1
+            data = item["data"]
+            key = data["key"]
+            title = data.get("title", "")
+            creators = data.get("creators", [])
+            
+            # Check if authors are missing/broken
+            has_valid_authors = True
+            
+            if not creators:
+                has_valid_authors = False
+            else:
+                # Check for obviously bad author data
+                for creator in creators:
+                    author_name = creator.get("lastName", "") + creator.get("firstName", "") + creator.get("name", "")
+                    stripped_name = author_name.strip()
+                    
+                    # Bad if: empty, suspiciously long, or matches _BAD_AUTHOR_RE
+                    if (
+                        not stripped_name or
+                        len(stripped_name) > 100 or
+                        _BAD_AUTHOR_RE.search(author_name)
+                    ):
+                        has_valid_authors = False
+                        break
+            
+            if has_valid_authors:
+                LOGGER.info(f"✓ {key}: Already has valid authors, skipping")
+                skipped_count += 1
+                continue
+            
+            LOGGER.info(f"🔧 {key}: Missing authors, re-scraping Scholar for: {title[:60]}...")
+            
+            # Search Scholar for this title
+            results = search_scholar(title, max_results=1)
+            
+            if not results:
+                LOGGER.warning(f"  ⚠️  No Scholar results found for: {title}")
+                failed_count += 1
+                continue
+            
+            # Use first result
+            paper = results[0]
+            new_authors = _author_creators(paper.get("authors", []))
+            
+            if not new_authors:
+                LOGGER.warning(f"  ⚠️  No authors found in Scholar result")
+                failed_count += 1
+                continue
+            
+            LOGGER.info(f"  Found {len(new_authors)} authors: {[a.get('lastName', a.get('name')) for a in new_authors]}")
+            
+            # Queue update; data carries key and version for the batch write
+            data["creators"] = new_authors
+            pending_updates.append(data)
+            
+            if len(pending_updates) >= WRITE_BATCH_SIZE:
+                fixed, failed = flush_updates(session, api_key, pending_updates)
+                fixed_count += fixed
+                failed_count += failed
+    finally:
+        fixed, failed = flush_updates(session, api_key, pending_updates)
+        fixed_count += fixed
+        failed_count += failed
     
-    LOGGER.info(f"\n🎉 COMPLETE:")
+    LOGGER.info(f"\n🎉 COMPLETE ({item_count} items):")
     LOGGER.info(f"  ✅ Fixed: {fixed_count}")
     LOGGER.info(f"  ⏭️  Skipped (already OK): {skipped_count}")
     LOGGER.info(f"  ❌ Failed: {failed_count}")
@@ -8,6 +8,8 @@ import logging
 import requests
 from pathlib import Path
 
+from zotero_client import build_session, iter_collection_items, json_dumps, json_loads
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 LOGGER = logging.getLogger(__name__)
 
@@ -16,34 +18,42 @@ GROUP_ID = "5120604"
 COLLECTION_KEY = "UV4I5VWV"
 PDF_DIR = Path("~/.openclaw/workspace/literature/pdfs").expanduser()
 
+# DOI characters that become "_" in downloaded PDF filenames
+_DOI_FNAME_TABLE = str.maketrans({'/': '_', ':': '_'})
+
 
 def load_config():
     with open(CONFIG_PATH) as f:
         return json.load(f)
 
 
-def get_collection_items(api_key):
-    """Fetch all items in the collection"""
-    url = f"https://api.zotero.org/groups/{GROUP_ID}/collections/{COLLECTION_KEY}/items?limit=100"
-    response = requests.get(url, headers={"Zotero-API-Key": api_key})
-    response.raise_for_status()
-    return response.json()
+def build_pdf_index(pdf_dir):
+    """Map DOI-shaped filename tokens to local PDF files, listing the directory once"""
+    pdf_index = {}
+    if not pdf_dir.is_dir():
+        return pdf_index
+    
+    # Filenames look like "<title>_<doi with / and : as _>.pdf"; index every
+    # "_"-separated suffix that starts like a DOI so lookups are exact
+    for pdf_path in pdf_dir.iterdir():
+        if pdf_path.suffix != ".pdf":
+            continue
+        parts = pdf_path.stem.split("_")
+        for index, part in enumerate(parts):
+            if part.startswith("10."):
+                pdf_index.setdefault("_".join(parts[index:]), pdf_path)
+    
+    return pdf_index
 
 
-def find_pdf_for_doi(doi):
+def find_pdf_for_doi(doi, pdf_index):
     """Find local PDF file matching a DOI"""
     if not doi:
         return None
     
     # Clean DOI for filename matching
-    doi_clean = doi.replace('/', '_').replace(':', '_')
-    
-    # Look for files containing this DOI
-    for pdf_path in PDF_DIR.glob("*.pdf"):
-        if doi_clean in pdf_path.name:
-            return pdf_path
-    
-    return None
+    doi_clean = doi.translate(_DOI_FNAME_TABLE)
+    return pdf_index.get(doi_clean)
 
 
 def attach_linked_pdf(api_key, item_key, pdf_path, title, version):
@@ -66,11 +76,11 @@ def attach_linked_pdf(api_key, item_key, pdf_path, title, version):
             "Zotero-API-Key": api_key,
             "Content-Type": "application/json"
         },
-        json=[attach_data]
+        data=json_dumps([attach_data])
     )
     
     if response.status_code in (200, 201):
-        result = response.json()
+        result = json_loads(response.content)
         attach_key = result.get("successful", {}).get("0", {}).get("key")
         if attach_key:
             LOGGER.info(f"📎 Linked PDF to item {item_key}")
@@ -87,15 +97,20 @@ def main():
     config = load_config()
     api_key = config["api_key"]
     
+    pdf_index = build_pdf_index(PDF_DIR)
+    LOGGER.info(f"Indexed {len(pdf_index)} DOI tokens from {PDF_DIR}")
+    
     LOGGER.info("Fetching items from collection...")
-    items = get_collection_items(api_key)
-    LOGGER.info(f"Found {len(items)} items")
+    session = build_session()
     
     # Find items with DOIs that have local PDFs
+    item_count = 0
     success_count = 0
     no_pdf_count = 0
     
-    for item in items:
+    # Items stream in page by page, so linking starts before the whole collection is fetched
+    for item in iter_collection_items(session, api_key, GROUP_ID, COLLECTION_KEY):
+        item_count += 1
         data = item["data"]
         key = data["key"]
         version = data["version"]
@@ -106,7 +121,7 @@ def main():
             continue
         
         # Check for local PDF
-        pdf_path = find_pdf_for_doi(doi)
+        pdf_path = find_pdf_for_doi(doi, pdf_index)
         if not pdf_path:
             no_pdf_count += 1
             continue
@@ -118,7 +133,7 @@ def main():
         if attach_linked_pdf(api_key, key, pdf_path, title, version):
             success_count += 1
         
-    LOGGER.info(f"\n\n🎉 COMPLETE:")
+    LOGGER.info(f"\n\n🎉 COMPLETE ({item_count} items):")
     LOGGER.info(f"  ✅ Linked: {success_count}")
     LOGGER.info(f"  ⏭️  No local PDF: {no_pdf_count}")
 
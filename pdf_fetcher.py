@@ -1,13 +1,20 @@
+import functools
 import logging
+import os
 import re
+import shutil
+import threading
 from pathlib import Path
 from typing import Optional, Tuple
 from urllib.parse import quote, urljoin
 
 import requests
 import yaml
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
 from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
 from urllib3.util.retry import Retry
 
 from doi_utils import normalize_doi, is_valid_doi
@@ -15,6 +22,24 @@ from doi_utils import normalize_doi, is_valid_doi
 
 LOGGER = logging.getLogger(__name__)
 DEFAULT_CONFIG = Path(__file__).with_name("config.yaml")
+COPY_BUFFER_SIZE = 64 * 1024
+
+_FNAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+# Probed in order; every selector requires "pdf" in an id or URL
+_SCIHUB_PDF_SELECTORS = [
+    CSSSelector(selector, translator="html")
+    for selector in (
+        "iframe#pdf",
+        "iframe[src*='.pdf']",
+        "embed[src*='.pdf']",
+        "a[href$='.pdf']",
+        "a[href*='/downloads/'][href*='.pdf']",
+    )
+]
 
 
 def _build_session() -> requests.Session:
@@ -28,7 +53,7 @@ def _build_session() -> requests.Session:
         status_forcelist=(429, 500, 502, 503, 504),
         allowed_methods=("GET", "HEAD"),
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=32, pool_maxsize=32)
     session.mount("https://", adapter)
     session.mount("http://", adapter)
     session.headers.update(
@@ -40,17 +65,42 @@ def _build_session() -> requests.Session:
     return session
 
 
+def _get_session() -> requests.Session:
+    """Return the process-wide session so parallel fetches share one connection pool."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session()
+    return _SESSION
+
+
+@functools.lru_cache(maxsize=4)
+def _load_config_cached(path_str: str, mtime: float) -> dict:
+    # mtime is only part of the cache key, so edits to the file are picked up
+    with open(path_str, "r", encoding="utf-8") as config_file:
+        config = yaml.safe_load(config_file) or {}
+
+    # Store mirrors as ready-to-use base URLs so the per-DOI loop only appends the DOI
+    config["scihub_mirrors"] = [
+        (mirror if mirror.startswith("http") else f"https://{mirror}").rstrip("/")
+        for mirror in config.get("scihub_mirrors") or []
+    ]
+    return config
+
+
 def _load_config(config_path: Optional[str] = None) -> dict:
+    """Load the YAML config, parsed once per file version. Treat the result as read-only."""
     cfg_path = Path(config_path).expanduser() if config_path else DEFAULT_CONFIG
     if not cfg_path.exists():
         raise FileNotFoundError(f"Config file not found: {cfg_path}")
-    with cfg_path.open("r", encoding="utf-8") as config_file:
-        return yaml.safe_load(config_file) or {}
+    path_str = str(cfg_path.resolve())
+    return _load_config_cached(path_str, os.path.getmtime(path_str))
 
 
 def _safe_filename(title: str, doi: str) -> str:
-    compact_title = re.sub(r"[^A-Za-z0-9._-]+", "_", title.strip())[:100] or "paper"
-    compact_doi = re.sub(r"[^A-Za-z0-9._-]+", "_", doi.strip())[:50]
+    compact_title = _FNAME_RE.sub("_", title.strip())[:100] or "paper"
+    compact_doi = _FNAME_RE.sub("_", doi.strip())[:50]
     return f"{compact_title}_{compact_doi}.pdf"
 
 
@@ -59,27 +109,28 @@ def _download_pdf(session: requests.Session, url: str, destination: Path) -> boo
         response = session.get(url, timeout=10, stream=True)
         response.raise_for_status()
 
+        response.raw.decode_content = True
+        first_bytes = response.raw.read(5)
+
         content_type = response.headers.get("Content-Type", "").lower()
-        if "pdf" not in content_type:
-            first_bytes = next(response.iter_content(chunk_size=5), b"")
-            if first_bytes != b"%PDF-":
-                LOGGER.info("Rejected non-PDF content from %s (Content-Type=%s)", url, content_type)
-                return False
-            destination.parent.mkdir(parents=True, exist_ok=True)
-            with destination.open("wb") as output_file:
-                output_file.write(first_bytes)
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        output_file.write(chunk)
-            return True
+        if "pdf" not in content_type and first_bytes != b"%PDF-":
+            LOGGER.info("Rejected non-PDF content from %s (Content-Type=%s)", url, content_type)
+            return False
 
         destination.parent.mkdir(parents=True, exist_ok=True)
-        with destination.open("wb") as output_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    output_file.write(chunk)
+        # Stream into a sibling file and rename once complete, so a broken
+        # download never leaves a truncated PDF under the final name
+        part_path = destination.with_name(destination.name + ".part")
+        try:
+            with part_path.open("wb") as output_file:
+                output_file.write(first_bytes)
+                shutil.copyfileobj(response.raw, output_file, length=COPY_BUFFER_SIZE)
+            os.replace(part_path, destination)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
         return True
-    except requests.RequestException as error:
+    except (requests.RequestException, Urllib3Error) as error:
         LOGGER.info("PDF download failed from %s: %s", url, error)
         return False
 
@@ -89,7 +140,8 @@ def _fetch_from_unpaywall(
     doi: str,
     email: str,
     destination: Path,
-) -> bool:
+) -> Tuple[bool, Optional[bool]]:
+    """Returns (downloaded, is_oa); is_oa is None when the lookup itself failed."""
     api_url = f"https://api.unpaywall.org/v2/{quote(doi)}"
     try:
         response = session.get(api_url, params={"email": email}, timeout=10)
@@ -97,46 +149,51 @@ def _fetch_from_unpaywall(
         payload = response.json()
     except requests.RequestException as error:
         LOGGER.info("Unpaywall lookup failed for DOI %s: %s", doi, error)
-        return False
+        return False, None
 
-    candidate_urls = []
-    best = payload.get("best_oa_location") or {}
-    for key in ("url_for_pdf", "url"):
-        if best.get(key):
-            candidate_urls.append(best[key])
+    is_oa = bool(payload.get("is_oa"))
 
-    for location in payload.get("oa_locations", []):
+    seen = set()
+    deduped_urls = []
+    best = payload.get("best_oa_location") or {}
+    for location in (best, *(payload.get("oa_locations") or [])):
         for key in ("url_for_pdf", "url"):
-            if location.get(key):
-                candidate_urls.append(location[key])
+            url = location.get(key)
+            if url and url not in seen:
+                seen.add(url)
+                deduped_urls.append(url)
 
-    deduped_urls = list(dict.fromkeys(candidate_urls))
     if not deduped_urls:
         LOGGER.info("Unpaywall has no OA URLs for DOI %s", doi)
-        return False
+        return False, is_oa
 
     for pdf_url in deduped_urls:
         LOGGER.info("Trying Unpaywall URL for DOI %s: %s", doi, pdf_url)
         if _download_pdf(session, pdf_url, destination):
-            return True
+            return True, is_oa
 
-    return False
+    return False, is_oa
 
 
 def _extract_scihub_pdf_url(html: str, mirror_url: str) -> Optional[str]:
-    soup = BeautifulSoup(html, "html.parser")
+    if "pdf" not in html:
+        return None
 
-    selectors = [
-        "iframe#pdf",
-        "iframe[src*='.pdf']",
-        "embed[src*='.pdf']",
-        "a[href$='.pdf']",
-        "a[href*='/downloads/'][href*='.pdf']",
-    ]
-    for selector in selectors:
-        element = soup.select_one(selector)
-        if not element:
+    try:
+        try:
+            root = lxml_html.fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            root = lxml_html.fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        # Empty documents (e.g. only a declaration and a comment)
+        return None
+
+    for selector in _SCIHUB_PDF_SELECTORS:
+        elements = selector(root)
+        if not elements:
             continue
+        element = elements[0]
         source = element.get("src") or element.get("href")
         if source:
             return urljoin(mirror_url, source)
@@ -149,9 +206,9 @@ def _fetch_from_scihub(
     mirrors: list,
     destination: Path,
 ) -> bool:
-    for mirror in mirrors:
-        base_url = mirror if mirror.startswith("http") else f"https://{mirror}"
-        lookup_url = f"{base_url.rstrip('/')}/{quote(doi)}"
+    """Try each mirror in turn; mirrors are base URLs as normalized by _load_config."""
+    for base_url in mirrors:
+        lookup_url = f"{base_url}/{quote(doi)}"
         LOGGER.info("Trying Sci-Hub mirror %s", lookup_url)
 
         try:
@@ -184,7 +241,8 @@ def fetch_pdf(doi: str, title: str, config_path: Optional[str] = None) -> Tuple[
 
     Source order:
     1) Unpaywall API
-    2) Sci-Hub mirrors
+    2) Sci-Hub mirrors, skipped when `skip_scihub_on_closed` is set in the
+       config and Unpaywall reports the DOI as closed access
 
     Returns:
         Tuple[pdf_path, source] or (None, None) when retrieval fails.
@@ -198,18 +256,26 @@ def fetch_pdf(doi: str, title: str, config_path: Optional[str] = None) -> Tuple[
     config = _load_config(config_path)
     unpaywall_email = config.get("unpaywall_email", "")
     scihub_mirrors = config.get("scihub_mirrors", [])
+    skip_scihub_on_closed = bool(config.get("skip_scihub_on_closed", False))
     download_dir = Path(config.get("pdf_download_dir", "./pdfs")).expanduser()
 
     if not unpaywall_email:
         LOGGER.warning("No Unpaywall email configured; skipping Unpaywall for DOI %s", cleaned_doi)
 
-    session = _build_session()
+    session = _get_session()
     filename = _safe_filename(title, cleaned_doi)
     destination = download_dir / filename
 
-    if unpaywall_email and _fetch_from_unpaywall(session, cleaned_doi, unpaywall_email, destination):
-        LOGGER.info("Fetched PDF via Unpaywall for DOI %s", cleaned_doi)
-        return str(destination), "unpaywall"
+    is_oa = None
+    if unpaywall_email:
+        downloaded, is_oa = _fetch_from_unpaywall(session, cleaned_doi, unpaywall_email, destination)
+        if downloaded:
+            LOGGER.info("Fetched PDF via Unpaywall for DOI %s", cleaned_doi)
+            return str(destination), "unpaywall"
+
+    if skip_scihub_on_closed and is_oa is False:
+        LOGGER.info("Unpaywall reports DOI %s as closed access; skipping Sci-Hub", cleaned_doi)
+        return None, None
 
     if _fetch_from_scihub(session, cleaned_doi, scihub_mirrors, destination):
         LOGGER.info("Fetched PDF via Sci-Hub for DOI %s", cleaned_doi)
@@ -1,19 +1,14 @@
 import argparse
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Optional
-
-import yaml
-from tqdm import tqdm
-
-from pdf_fetcher import fetch_pdf
-from scholar_search import search_scholar
-from zotero_manager import add_paper
+from typing import Dict, Optional, Tuple
 
 
 DOI_PATTERN = re.compile(r"10\.\d{4,}/\S+", re.IGNORECASE)
 DEFAULT_CONFIG_PATH = Path(__file__).with_name("config.yaml")
+PDF_FETCH_WORKERS = 8
 
 
 def configure_logging() -> None:
@@ -28,6 +23,8 @@ def configure_logging() -> None:
 
 
 def load_config(config_path: Optional[str] = None) -> Dict:
+    import yaml
+
     path = Path(config_path).expanduser() if config_path else DEFAULT_CONFIG_PATH
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
@@ -40,6 +37,13 @@ def is_valid_doi(doi: Optional[str]) -> bool:
 
 
 def run_pipeline(question: str, max_papers: int, collection: Optional[str], config_path: Optional[str]) -> int:
+    # Deferred so `--help` and argument errors don't pay for the network/parsing stack
+    from tqdm import tqdm
+
+    from pdf_fetcher import fetch_pdf
+    from scholar_search import search_scholar
+    from zotero_manager import add_paper
+
     logger = logging.getLogger(__name__)
     config = load_config(config_path)
     zotero_config_path = config.get("zotero_config_path")
@@ -50,20 +54,30 @@ def run_pipeline(question: str, max_papers: int, collection: Optional[str], conf
     pdf_success_count = 0
     zotero_success_count = 0
 
-    for paper in tqdm(papers, desc="Processing papers", unit="paper"):
-        doi = (paper.get("doi") or "").strip()
-        pdf_path = None
-        source = None
-
-        if is_valid_doi(doi):
+    # PDF retrieval is network-bound, so fetch in parallel; Zotero writes stay serial below
+    pdf_results: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+    with ThreadPoolExecutor(max_workers=PDF_FETCH_WORKERS) as executor:
+        futures = {}
+        for index, paper in enumerate(papers):
+            doi = (paper.get("doi") or "").strip()
+            if is_valid_doi(doi):
+                future = executor.submit(fetch_pdf, doi, paper.get("title", "paper"), config_path=config_path)
+                futures[future] = index
+            else:
+                logger.info("Skipping PDF retrieval; DOI missing or invalid for '%s'", paper.get("title", ""))
+
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Fetching PDFs", unit="paper"):
+            index = futures[future]
             try:
-                pdf_path, source = fetch_pdf(doi, paper.get("title", "paper"), config_path=config_path)
-                if pdf_path:
-                    pdf_success_count += 1
+                pdf_results[index] = future.result()
             except Exception as error:
-                logger.warning("PDF retrieval failed for DOI %s: %s", doi, error)
-        else:
-            logger.info("Skipping PDF retrieval; DOI missing or invalid for '%s'", paper.get("title", ""))
+                logger.warning("PDF retrieval failed for DOI %s: %s", papers[index].get("doi"), error)
+                continue
+            if pdf_results[index][0]:
+                pdf_success_count += 1
+
+    for index, paper in enumerate(tqdm(papers, desc="Adding to Zotero", unit="paper")):
+        pdf_path, source = pdf_results.get(index, (None, None))
 
         item_metadata = dict(paper)
         if collection:
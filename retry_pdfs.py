@@ -3,14 +3,25 @@
 Retry PDF fetching for papers in Zotero collection that have DOIs but no PDFs.
 Uses only sci-hub.ru (the working mirror).
 """
-import json
 import logging
 import os
 import re
 import requests
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import quote, urljoin
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+from zotero_client import WRITE_BATCH_SIZE, build_session, create_items, iter_collection_items, json_loads
+
+try:
+    import requests_cache
+except ImportError:  # optional, see requirements.txt
+    requests_cache = None
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 LOGGER = logging.getLogger(__name__)
@@ -22,19 +33,53 @@ PDF_DIR = Path("~/.openclaw/workspace/literature/pdfs").expanduser()
 PDF_DIR.mkdir(parents=True, exist_ok=True)
 
 SCIHUB_MIRROR = "https://sci-hub.ru"
+# Papers processed at once; each worker still pauses between its own Sci-Hub hits
+MAX_CONCURRENT_FETCHES = 4
+# Pause after each paper so a worker never hammers the mirror
+RATE_LIMIT_SECONDS = 2
+_sleep = time.sleep
 
+_DOI_TAIL_RE = re.compile(r'/\d+$')
+_DOI_RE = re.compile(r'^10\.\d{4,}/\S+$')
+_FILENAME_RE = re.compile(r'[^A-Za-z0-9._-]+')
+_ONCLICK_PDF_RE = re.compile(r"'([^']+\.pdf[^']*)'")
+# Tags the Sci-Hub link probes look at. lxml's tag-filtered iter() runs in C
+# and measured faster than an equivalent precompiled XPath union, which
+# rescans the tree once per branch
+_SCIHUB_LINK_TAGS = ('iframe', 'embed', 'a', 'button')
 
-def load_config():
-    with open(CONFIG_PATH) as f:
-        return json.load(f)
+# One keep-alive pool shared by every Sci-Hub and Zotero request
+SESSION = build_session(pool_connections=8, pool_maxsize=16)
+SESSION.headers.update({
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) LiteratureResearchBot/1.0",
+    "Accept": "text/html,application/pdf,*/*",
+})
+
+
+SCIHUB_CACHE_PATH = Path(__file__).with_name("scihub_cache.sqlite")
+
+
+def build_lookup_session():
+    """Session for Sci-Hub lookup pages, cached on disk for a day when requests-cache is installed"""
+    if requests_cache is None:
+        return SESSION
+    
+    # PDF bodies are never cached, only the HTML lookup pages
+    session = requests_cache.CachedSession(
+        SCIHUB_CACHE_PATH,
+        backend="sqlite",
+        expire_after=24 * 60 * 60,
+        allowable_codes=(200,),
+        filter_fn=lambda response: "pdf" not in response.headers.get("Content-Type", "").lower(),
+    )
+    session.headers.update(SESSION.headers)
+    session.mount("https://", SESSION.get_adapter("https://"))
+    session.mount("http://", SESSION.get_adapter("http://"))
+    return session
 
 
-def get_collection_items(api_key):
-    """Fetch all items in the collection"""
-    url = f"https://api.zotero.org/groups/{GROUP_ID}/collections/{COLLECTION_KEY}/items?limit=100"
-    response = requests.get(url, headers={"Zotero-API-Key": api_key})
-    response.raise_for_status()
-    return response.json()
+def load_config():
+    return json_loads(CONFIG_PATH.read_bytes())
 
 
 def clean_doi(doi):
@@ -42,25 +87,48 @@ def clean_doi(doi):
     if not doi:
         return None
     # Remove trailing URL fragments like /1307371
-    doi = re.sub(r'/\d+$', '', doi.strip())
-    return doi if re.match(r'^10\.\d{4,}/\S+$', doi) else None
+    doi = _DOI_TAIL_RE.sub('', doi.strip())
+    return doi if _DOI_RE.match(doi) else None
+
+
+def _scihub_link_rank(element):
+    """Priority of a candidate element, mirroring the old selector order (lower wins)"""
+    tag = element.tag
+    if tag == 'iframe':
+        if element.get('id') == 'pdf':
+            return 0
+        if '.pdf' in (element.get('src') or ''):
+            return 1
+    elif tag == 'embed' and '.pdf' in (element.get('src') or ''):
+        return 2
+    elif tag == 'a' and (element.get('href') or '').endswith('.pdf'):
+        return 3
+    elif tag == 'button' and 'pdf' in (element.get('onclick') or ''):
+        return 4
+    return None
 
 
 def extract_scihub_pdf_url(html, base_url):
     """Extract PDF URL from Sci-Hub HTML response"""
-    soup = BeautifulSoup(html, "html.parser")
-    
-    selectors = [
-        "iframe#pdf",
-        "iframe[src*='.pdf']",
-        "embed[src*='.pdf']",
-        "a[href$='.pdf']",
-        "button[onclick*='pdf']",
-    ]
-    
-    for selector in selectors:
-        element = soup.select_one(selector)
-        if not element:
+    # Every candidate needs "pdf" somewhere in its markup
+    if 'pdf' not in html:
+        return None
+    
+    try:
+        try:
+            tree = lxml_html.fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            tree = lxml_html.fromstring(html.encode('utf-8'))
+    except etree.ParserError:
+        # Empty documents (e.g. only a declaration and a comment)
+        return None
+    
+    # One walk over the candidate tags, keeping the highest-priority match
+    best_rank, best_url = None, None
+    for element in tree.iter(*_SCIHUB_LINK_TAGS):
+        rank = _scihub_link_rank(element)
+        if rank is None or (best_rank is not None and rank >= best_rank):
             continue
         
         # Check src, href, and onclick attributes
@@ -69,179 +137,242 @@ def extract_scihub_pdf_url(html, base_url):
             if value and '.pdf' in value:
                 # Extract URL from onclick if needed
                 if attr == 'onclick':
-                    match = re.search(r"'([^']+\.pdf[^']*)'", value)
+                    match = _ONCLICK_PDF_RE.search(value)
                     if match:
                         value = match.group(1)
-                return urljoin(base_url, value)
+                best_rank, best_url = rank, urljoin(base_url, value)
+                break
+        
+        if best_rank == 0:
+            break
     
-    return None
+    return best_url
+
+
+def save_pdf(response, pdf_path):
+    """Stream a response body to disk in 64 KiB chunks; pdf_path only appears once the body is complete"""
+    response.raw.decode_content = True
+    part_path = pdf_path.with_name(pdf_path.name + '.part')
+    try:
+        with open(part_path, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, length=65536)
+        os.replace(part_path, pdf_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+
+def pdf_filename(cleaned_doi, title):
+    """Local filename a fetched PDF is saved under"""
+    return _FILENAME_RE.sub('_', title[:80]) + f"_{cleaned_doi.replace('/', '_')}.pdf"
+
+
+def is_complete_pdf(pdf_path):
+    """Cheap sanity check for a PDF already on disk: non-empty and starts with the %PDF- magic"""
+    try:
+        with open(pdf_path, 'rb') as f:
+            return f.read(5) == b'%PDF-'
+    except OSError:
+        return False
 
 
-def fetch_pdf_scihub(doi, title):
-    """Fetch PDF from Sci-Hub"""
+def fetch_pdf_scihub(session, doi, title, lookup_session=None):
+    """Fetch PDF from Sci-Hub; lookup_session (default: session) serves the HTML lookup page"""
     cleaned_doi = clean_doi(doi)
     if not cleaned_doi:
         LOGGER.warning(f"Invalid DOI: {doi}")
         return None
     
+    filename = pdf_filename(cleaned_doi, title)
+    pdf_path = PDF_DIR / filename
+    
     lookup_url = f"{SCIHUB_MIRROR}/{quote(cleaned_doi)}"
     LOGGER.info(f"Trying Sci-Hub: {lookup_url}")
     
-    session = requests.Session()
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) LiteratureResearchBot/1.0",
-        "Accept": "text/html,application/pdf,*/*",
-    })
-    
     try:
-        response = session.get(lookup_url, timeout=15)
-        response.raise_for_status()
-    except requests.RequestException as error:
+        with (lookup_session or session).get(lookup_url, timeout=15, stream=True) as response:
+            response.raise_for_status()
+            
+            # Check if direct PDF response
+            content_type = response.headers.get("Content-Type", "").lower()
+            if "pdf" in content_type:
+                save_pdf(response, pdf_path)
+                LOGGER.info(f"✅ Downloaded PDF directly: {filename}")
+                return str(pdf_path)
+            
+            html = response.text
+    except (requests.RequestException, Urllib3Error) as error:
         LOGGER.warning(f"Sci-Hub request failed: {error}")
         return None
     
-    # Check if direct PDF response
-    content_type = response.headers.get("Content-Type", "").lower()
-    if "pdf" in content_type:
-        filename = re.sub(r'[^A-Za-z0-9._-]+', '_', title[:80]) + f"_{cleaned_doi.replace('/', '_')}.pdf"
-        pdf_path = PDF_DIR / filename
-        pdf_path.write_bytes(response.content)
-        LOGGER.info(f"✅ Downloaded PDF directly: {filename}")
-        return str(pdf_path)
-    
     # Extract PDF URL from HTML
-    pdf_url = extract_scihub_pdf_url(response.text, SCIHUB_MIRROR)
+    pdf_url = extract_scihub_pdf_url(html, SCIHUB_MIRROR)
     if not pdf_url:
         LOGGER.warning("No PDF link found in Sci-Hub response")
         return None
     
     # Download PDF from extracted URL
     try:
-        pdf_response = session.get(pdf_url, timeout=15)
-        pdf_response.raise_for_status()
-        
-        filename = re.sub(r'[^A-Za-z0-9._-]+', '_', title[:80]) + f"_{cleaned_doi.replace('/', '_')}.pdf"
-        pdf_path = PDF_DIR / filename
-        pdf_path.write_bytes(pdf_response.content)
+        with session.get(pdf_url, timeout=15, stream=True) as pdf_response:
+            pdf_response.raise_for_status()
+            save_pdf(pdf_response, pdf_path)
         LOGGER.info(f"✅ Downloaded PDF via URL: {filename}")
         return str(pdf_path)
-    except requests.RequestException as error:
+    except (requests.RequestException, Urllib3Error) as error:
         LOGGER.warning(f"PDF download failed: {error}")
         return None
 
 
-def attach_pdf_to_item(api_key, item_key, pdf_path, title):
-    """Attach PDF to Zotero item"""
-    pdf_file = Path(pdf_path)
-    
-    with open(pdf_file, 'rb') as f:
-        pdf_data = f.read()
-    
-    # Create attachment item
-    attach_data = {
+def attachment_payload(item_key, pdf_path, title):
+    """Build the attachment item registered for a fetched PDF"""
+    return {
         "itemType": "attachment",
         "parentItem": item_key,
         "linkMode": "imported_file",
         "contentType": "application/pdf",
-        "filename": pdf_file.name,
+        "filename": Path(pdf_path).name,
         "title": f"PDF - {title[:50]}"
     }
-    
-    # Register attachment
-    response = requests.post(
-        f"https://api.zotero.org/groups/{GROUP_ID}/items",
-        headers={
-            "Zotero-API-Key": api_key,
-            "Content-Type": "application/json"
-        },
-        json=[attach_data]
-    )
-    
-    if response.status_code not in (200, 201):
-        LOGGER.error(f"Failed to create attachment: {response.status_code}")
-        return False
-    
-    result = response.json()
-    attach_key = result.get("successful", {}).get("0", {}).get("key")
-    
-    if not attach_key:
-        LOGGER.error("Could not extract attachment key")
+
+
+def upload_pdf(session, api_key, item_key, attach_key, pdf_path):
+    """Upload file content for a registered attachment item"""
+    # Pass the open file so requests streams it rather than reading it into memory
+    try:
+        with open(pdf_path, 'rb') as f:
+            response_upload = session.post(
+                f"https://api.zotero.org/groups/{GROUP_ID}/items/{attach_key}/file",
+                headers={
+                    "Zotero-API-Key": api_key,
+                    "Content-Type": "application/pdf",
+                    "If-None-Match": "*"
+                },
+                data=f
+            )
+    except (requests.RequestException, OSError) as error:
+        LOGGER.warning(f"Failed to upload PDF for {item_key}: {error}")
         return False
     
-    # Upload file content
-    response_upload = requests.post(
-        f"https://api.zotero.org/groups/{GROUP_ID}/items/{attach_key}/file",
-        headers={
-            "Zotero-API-Key": api_key,
-            "Content-Type": "application/pdf",
-            "If-None-Match": "*"
-        },
-        data=pdf_data
-    )
-    
     if response_upload.status_code == 204:
         LOGGER.info(f"📎 Attached PDF to Zotero item {item_key}")
         return True
     else:
-        LOGGER.warning(f"Failed to upload PDF: {response_upload.status_code}")
+        LOGGER.warning(f"Failed to upload PDF for {item_key}: {response_upload.status_code}")
         return False
 
 
+def fetch_paper(paper, position, total, lookup_session=None):
+    """Fetch one paper's PDF; returns its path or None"""
+    LOGGER.info(f"\n🔍 [{position}/{total}] {paper['title'][:60]}...")
+    LOGGER.info(f"   DOI: {paper['doi']}")
+    
+    try:
+        pdf_path = fetch_pdf_scihub(SESSION, paper['doi'], paper['title'], lookup_session=lookup_session)
+        if not pdf_path:
+            LOGGER.info(f"   ❌ [{position}/{total}] Failed to fetch PDF")
+        return pdf_path
+    except Exception as error:
+        # One bad paper (disk full, cache or parser error) must not sink the attach phase
+        LOGGER.warning(f"   ❌ [{position}/{total}] Unexpected error fetching PDF: {error}")
+        return None
+    finally:
+        _sleep(RATE_LIMIT_SECONDS)
+
+
+def attach_fetched(api_key, fetched):
+    """Register attachments WRITE_BATCH_SIZE per request, then upload files concurrently; returns success count"""
+    uploads = []
+    for start in range(0, len(fetched), WRITE_BATCH_SIZE):
+        batch = fetched[start:start + WRITE_BATCH_SIZE]
+        attach_keys = create_items(
+            SESSION,
+            api_key,
+            GROUP_ID,
+            [attachment_payload(paper['key'], pdf_path, paper['title']) for paper, pdf_path in batch],
+        )
+        for (paper, pdf_path), attach_key in zip(batch, attach_keys):
+            if attach_key:
+                uploads.append((paper['key'], attach_key, pdf_path))
+            else:
+                LOGGER.info(f"   ⚠️  PDF fetched but attachment failed: {paper['title'][:60]}")
+    
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as executor:
+        outcomes = list(executor.map(lambda upload: upload_pdf(SESSION, api_key, *upload), uploads))
+    return sum(outcomes)
+
+
+def pdf_parent_keys(api_key):
+    """Keys of items in the collection that already have a PDF attachment, from one paged listing"""
+    return {
+        attachment["data"]["parentItem"]
+        for attachment in iter_collection_items(
+            SESSION, api_key, GROUP_ID, COLLECTION_KEY, params={"itemType": "attachment"}
+        )
+        if attachment["data"].get("contentType") == "application/pdf" and attachment["data"].get("parentItem")
+    }
+
+
 def main():
     config = load_config()
     api_key = config["api_key"]
     
     LOGGER.info("Fetching items from collection...")
-    items = get_collection_items(api_key)
-    LOGGER.info(f"Found {len(items)} items")
+    
+    with_pdf = pdf_parent_keys(api_key)
     
     # Filter: has DOI, no existing PDF attachment
+    item_count = 0
+    already_attached = 0
     candidates = []
-    for item in items:
+    for item in iter_collection_items(SESSION, api_key, GROUP_ID, COLLECTION_KEY):
+        item_count += 1
         data = item["data"]
         doi = data.get("DOI", "")
         if not doi:
             continue
         
-        # Check if already has PDF attachment
-        has_pdf = any(
-            child.get("data", {}).get("contentType") == "application/pdf"
-            for child in item.get("links", {}).get("attachment", {}).get("attachments", [])
-        )
+        if data["key"] in with_pdf:
+            already_attached += 1
+            continue
         
-        # Simplified check: just try to fetch for all with DOIs
         candidates.append({
             "key": data["key"],
             "title": data.get("title", ""),
             "doi": doi
         })
     
-    LOGGER.info(f"Found {len(candidates)} papers with DOIs to try fetching")
-    
-    success_count = 0
-    failed_count = 0
+    LOGGER.info(f"Found {item_count} items, {already_attached} already with PDFs, {len(candidates)} papers with DOIs to try fetching")
     
+    # PDFs left on disk by an earlier run only need attaching, not downloading again;
+    # files that are not real PDFs (saved error pages) are fetched afresh
+    existing_files = {path.name for path in PDF_DIR.iterdir()}
+    fetched = []
+    to_download = []
     for paper in candidates:
-        LOGGER.info(f"\n🔍 [{success_count + failed_count + 1}/{len(candidates)}] {paper['title'][:60]}...")
-        LOGGER.info(f"   DOI: {paper['doi']}")
-        
-        pdf_path = fetch_pdf_scihub(paper['doi'], paper['title'])
-        
-        if pdf_path:
-            # Attach to Zotero
-            if attach_pdf_to_item(api_key, paper['key'], pdf_path, paper['title']):
-                success_count += 1
-                LOGGER.info("   ✅ SUCCESS!")
-            else:
-                failed_count += 1
-                LOGGER.info("   ⚠️  PDF fetched but attachment failed")
+        cleaned_doi = clean_doi(paper['doi'])
+        filename = pdf_filename(cleaned_doi, paper['title']) if cleaned_doi else None
+        if filename in existing_files and is_complete_pdf(PDF_DIR / filename):
+            fetched.append((paper, str(PDF_DIR / filename)))
         else:
-            failed_count += 1
-            LOGGER.info("   ❌ Failed to fetch PDF")
-        
-        # Rate limiting
-        import time
-        time.sleep(2)
+            if filename in existing_files:
+                LOGGER.info(f"   ⚠️  Ignoring invalid local PDF: {filename}")
+            to_download.append(paper)
+    if fetched:
+        LOGGER.info(f"Reusing {len(fetched)} PDFs already in {PDF_DIR}")
+    
+    # Network-bound: overlap papers, capped so Sci-Hub sees at most a few requests at once
+    lookup_session = build_lookup_session()
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as executor:
+        pdf_paths = list(executor.map(
+            lambda args: fetch_paper(args[1], args[0], len(to_download), lookup_session),
+            enumerate(to_download, start=1),
+        ))
+    
+    fetched.extend((paper, pdf_path) for paper, pdf_path in zip(to_download, pdf_paths) if pdf_path)
+    LOGGER.info(f"Fetched {len(fetched)} PDFs; attaching to Zotero...")
+    
+    success_count = attach_fetched(api_key, fetched)
+    failed_count = len(candidates) - success_count
     
     LOGGER.info(f"\n\n🎉 COMPLETE:")
     LOGGER.info(f"  ✅ Success: {success_count}")
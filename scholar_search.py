@@ -1,23 +1,52 @@
 import logging
 import random
 import re
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 from urllib.parse import urlencode
 
 import requests
-from bs4 import BeautifulSoup
 from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 from urllib3.util.retry import Retry
 
 from doi_utils import normalize_doi
 
+try:
+    import requests_cache
+except ImportError:  # optional, see requirements.txt
+    requests_cache = None
+
 
 LOGGER = logging.getLogger(__name__)
+# Anchored to the repo so the cache does not follow the working directory
+SCHOLAR_CACHE_PATH = Path(__file__).with_name("scholar_cache.sqlite")
+CACHE_EXPIRE_SECONDS = 24 * 60 * 60
+SCHOLAR_PAGE_SIZE = 10
+# Result pages requested concurrently; kept small so Scholar's rate limiter is not provoked
+SCHOLAR_PAGES_IN_FLIGHT = 3
+
+_YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+# Scholar separates authors from the venue with "\xa0-" or " -"
+_AUTHOR_SPLIT_RE = re.compile(r"[\xa0\s]-")
+_CITED_BY_RE = re.compile(r"Cited by\s+(\d+)", re.IGNORECASE)
 
 
 def _build_session() -> requests.Session:
-    session = requests.Session()
+    if requests_cache is not None:
+        # Repeat queries are answered from disk for a day; rate-limit pages are never stored
+        session = requests_cache.CachedSession(
+            SCHOLAR_CACHE_PATH,
+            backend="sqlite",
+            expire_after=CACHE_EXPIRE_SECONDS,
+            allowable_codes=(200,),
+            filter_fn=lambda response: not _is_rate_limited(response.text),
+        )
+    else:
+        session = requests.Session()
     retry = Retry(
         total=3,
         connect=3,
@@ -40,7 +69,7 @@ def _build_session() -> requests.Session:
 
 
 def _extract_year(authors_blob: str) -> Optional[int]:
-    match = re.search(r"\b(19|20)\d{2}\b", authors_blob)
+    match = _YEAR_RE.search(authors_blob)
     return int(match.group()) if match else None
 
 
@@ -48,14 +77,16 @@ def _extract_authors(authors_blob: str) -> List[str]:
     # Scholar format: "Authors\xa0- Publication, Year - Domain"
     # Extract only the authors segment (before first "\xa0-" or " - ")
     # Handle both regular space and non-breaking space
-    segment = re.split(r'[\xa0\s]-', authors_blob, maxsplit=1)[0]
+    segment = _AUTHOR_SPLIT_RE.split(authors_blob, maxsplit=1)[0]
     return [author.strip() for author in segment.split(",") if author.strip()]
 
 
 def _extract_doi(*candidates: str) -> Optional[str]:
     """Extract and normalize DOI from candidate strings"""
     for value in candidates:
-        if not value:
+        # Every DOI starts with "10.", so most titles and snippets are ruled out
+        # by a substring check before any regex work
+        if not value or "10." not in value:
             continue
         # Use the new DOI normalization utility
         normalized = normalize_doi(value)
@@ -64,10 +95,9 @@ def _extract_doi(*candidates: str) -> Optional[str]:
     return None
 
 
-def _extract_citations(result_entry: BeautifulSoup) -> int:
-    for link in result_entry.select(".gs_fl a"):
-        text = link.get_text(" ", strip=True)
-        match = re.search(r"Cited by\s+(\d+)", text, re.IGNORECASE)
+def _extract_citations(link_texts: Iterable[str]) -> int:
+    for text in link_texts:
+        match = _CITED_BY_RE.search(text)
         if match:
             return int(match.group(1))
     return 0
@@ -83,8 +113,56 @@ def _is_rate_limited(response_text: str) -> bool:
     return any(marker in lowered for marker in markers)
 
 
-def _parse_results(page_html: str) -> List[Dict]:
-    soup = BeautifulSoup(page_html, "html.parser")
+def _build_entry(title: str, url: str, snippet: str, authors_text: str, citation_texts: Iterable[str]) -> Dict:
+    return {
+        "title": title,
+        "authors": _extract_authors(authors_text),
+        "year": _extract_year(authors_text),
+        "doi": _extract_doi(title, url, snippet),
+        "url": url,
+        "snippet": snippet,
+        "citations": _extract_citations(citation_texts),
+    }
+
+
+def _node_text(node: Optional[LexborNode]) -> str:
+    # Same normalization as BeautifulSoup's get_text(" ", strip=True): strip each
+    # text node, drop the empty ones, join with single spaces
+    if node is None:
+        return ""
+    parts = node.text(separator="\x00").split("\x00")
+    return " ".join(stripped for stripped in (part.strip() for part in parts) if stripped)
+
+
+def _parse_results_lexbor(page_html: str, needed: Optional[int] = None) -> List[Dict]:
+    tree = LexborHTMLParser(page_html)
+    entries = []
+
+    for result in tree.css("div.gs_r.gs_or.gs_scl"):
+        title_anchor = result.css_first("h3.gs_rt a")
+        title_element = title_anchor or result.css_first("h3.gs_rt")
+        if not title_element:
+            continue
+
+        entries.append(
+            _build_entry(
+                title=_node_text(title_element),
+                url=(title_anchor.attributes.get("href") or "") if title_anchor else "",
+                snippet=_node_text(result.css_first("div.gs_rs")),
+                authors_text=_node_text(result.css_first("div.gs_a")),
+                citation_texts=(_node_text(link) for link in result.css(".gs_fl a")),
+            )
+        )
+        if len(entries) == needed:
+            break
+
+    return entries
+
+
+def _parse_results_bs4(page_html: str, needed: Optional[int] = None) -> List[Dict]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page_html, "lxml")
     entries = []
 
     for result in soup.select("div.gs_r.gs_or.gs_scl"):
@@ -93,27 +171,55 @@ def _parse_results(page_html: str) -> List[Dict]:
         if not title_element:
             continue
 
-        title = title_element.get_text(" ", strip=True)
-        url = title_anchor.get("href", "") if title_anchor else ""
         snippet_el = result.select_one("div.gs_rs")
-        snippet = snippet_el.get_text(" ", strip=True) if snippet_el else ""
         authors_blob = result.select_one("div.gs_a")
-        authors_text = authors_blob.get_text(" ", strip=True) if authors_blob else ""
-
-        entry = {
-            "title": title,
-            "authors": _extract_authors(authors_text),
-            "year": _extract_year(authors_text),
-            "doi": _extract_doi(title, url, snippet),
-            "url": url,
-            "snippet": snippet,
-            "citations": _extract_citations(result),
-        }
-        entries.append(entry)
+        entries.append(
+            _build_entry(
+                title=title_element.get_text(" ", strip=True),
+                url=title_anchor.get("href", "") if title_anchor else "",
+                snippet=snippet_el.get_text(" ", strip=True) if snippet_el else "",
+                authors_text=authors_blob.get_text(" ", strip=True) if authors_blob else "",
+                citation_texts=(link.get_text(" ", strip=True) for link in result.select(".gs_fl a")),
+            )
+        )
+        if len(entries) == needed:
+            break
 
     return entries
 
 
+def _parse_results(page_html: str, needed: Optional[int] = None) -> List[Dict]:
+    """Parse up to `needed` result entries (all of them when None) from a Scholar page."""
+    try:
+        return _parse_results_lexbor(page_html, needed)
+    except Exception as error:
+        LOGGER.warning("Lexbor parse of Scholar page failed (%s); falling back to BeautifulSoup", error)
+        return _parse_results_bs4(page_html, needed)
+
+
+def _fetch_page(
+    session: requests.Session,
+    query: str,
+    start: int,
+    stop: threading.Event,
+) -> Optional[requests.Response]:
+    # Once a page of the wave has failed, its siblings are not sent at all
+    if stop.is_set():
+        return None
+    params = {"q": query, "hl": "en", "start": start}
+    scholar_url = f"https://scholar.google.com/scholar?{urlencode(params)}"
+    LOGGER.info("Fetching Scholar page start=%s", start)
+    try:
+        response = session.get(scholar_url, timeout=10)
+        response.raise_for_status()
+    except requests.RequestException:
+        stop.set()
+        raise
+    if _is_rate_limited(response.text):
+        stop.set()
+    return response
+
+
 def search_scholar(query: str, max_results: int = 10) -> List[Dict]:
     """
     Search Google Scholar and return normalized metadata records.
@@ -129,37 +235,84 @@ def search_scholar(query: str, max_results: int = 10) -> List[Dict]:
     start = 0
     attempts = 0
     max_attempts = 4
-
-    while len(results) < max_results and attempts < max_attempts:
-        params = {"q": query, "hl": "en", "start": start}
-        scholar_url = f"https://scholar.google.com/scholar?{urlencode(params)}"
-        LOGGER.info("Fetching Scholar page start=%s", start)
-
-        try:
-            response = session.get(scholar_url, timeout=10)
-            response.raise_for_status()
-        except requests.RequestException as error:
-            wait_seconds = 2 ** attempts
-            LOGGER.warning("Scholar request failed (%s). Retrying in %ss", error, wait_seconds)
-            time.sleep(wait_seconds)
-            attempts += 1
-            continue
-
-        if response.status_code == 429 or _is_rate_limited(response.text):
-            wait_seconds = min(30, (2 ** attempts) + random.uniform(0.2, 1.5))
-            LOGGER.warning("Scholar rate limit detected. Backing off for %.1fs", wait_seconds)
-            time.sleep(wait_seconds)
-            attempts += 1
-            continue
-
-        page_results = _parse_results(response.text)
-        if not page_results:
-            LOGGER.info("No further Scholar results found")
-            break
-
-        results.extend(page_results)
-        start += 10
-        attempts = 0
-        time.sleep(random.uniform(1.0, 2.0))
+    # Drops to a single page after a failure so backoff retries are not multiplied
+    wave_size = SCHOLAR_PAGES_IN_FLIGHT
+    # Pages that arrived intact while an earlier page of their wave failed
+    buffered: Dict[int, requests.Response] = {}
+
+    with ThreadPoolExecutor(max_workers=SCHOLAR_PAGES_IN_FLIGHT) as executor:
+        while len(results) < max_results and attempts < max_attempts:
+            pages_needed = -(-(max_results - len(results)) // SCHOLAR_PAGE_SIZE)
+            page_starts = [start + index * SCHOLAR_PAGE_SIZE for index in range(pages_needed)]
+
+            stop = threading.Event()
+            futures: Dict[int, Future] = {}
+            for page_start in [page for page in page_starts if page not in buffered][:wave_size]:
+                # Staggered so a wave does not reach Scholar as a single burst
+                if futures:
+                    time.sleep(random.uniform(0.3, 0.8))
+                if stop.is_set():
+                    break
+                futures[page_start] = executor.submit(_fetch_page, session, query, page_start, stop)
+            sent_requests = bool(futures)
+
+            # Pages are consumed in order; a failure ends the wave and the next
+            # wave resumes from the failed page
+            outcome = "ok"
+            from_cache = True
+            while len(results) < max_results:
+                if start in buffered:
+                    response = buffered.pop(start)
+                elif start in futures:
+                    try:
+                        response = futures.pop(start).result()
+                    except requests.RequestException as error:
+                        wait_seconds = 2 ** attempts
+                        LOGGER.warning("Scholar request failed (%s). Retrying in %ss", error, wait_seconds)
+                        time.sleep(wait_seconds)
+                        attempts += 1
+                        wave_size = 1
+                        outcome = "retry"
+                        break
+
+                    if response is None:
+                        break
+
+                    if response.status_code == 429 or _is_rate_limited(response.text):
+                        wait_seconds = min(30, (2 ** attempts) + random.uniform(0.2, 1.5))
+                        LOGGER.warning("Scholar rate limit detected. Backing off for %.1fs", wait_seconds)
+                        time.sleep(wait_seconds)
+                        attempts += 1
+                        wave_size = 1
+                        outcome = "retry"
+                        break
+                    from_cache = from_cache and getattr(response, "from_cache", False)
+                else:
+                    break
+
+                page_results = _parse_results(response.text, max_results - len(results))
+                if not page_results:
+                    LOGGER.info("No further Scholar results found")
+                    outcome = "done"
+                    break
+
+                results.extend(page_results)
+                start += SCHOLAR_PAGE_SIZE
+                attempts = 0
+                wave_size = SCHOLAR_PAGES_IN_FLIGHT
+
+            # Later pages that already succeeded are kept rather than requested again
+            for page_start, future in futures.items():
+                try:
+                    response = future.result()
+                except requests.RequestException:
+                    continue
+                if response is not None and not _is_rate_limited(response.text):
+                    buffered[page_start] = response
+
+            if outcome == "done":
+                break
+            if outcome == "ok" and sent_requests and not from_cache:
+                time.sleep(random.uniform(1.0, 2.0))
 
     return results[:max_results]
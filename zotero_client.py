@@ -0,0 +1,202 @@
+"""
+Shared Zotero Web API helpers for the collection maintenance scripts.
+"""
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional accelerator, see requirements.txt
+    orjson = None
+
+
+LOGGER = logging.getLogger(__name__)
+
+API_BASE = "https://api.zotero.org"
+PAGE_SIZE = 100
+MAX_WORKERS = 8
+WRITE_BATCH_SIZE = 50
+
+
+def json_loads(content: bytes) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def json_dumps(payload: Any) -> bytes:
+    """Encode a JSON request body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def build_session(pool_connections: int = 16, pool_maxsize: int = 16) -> requests.Session:
+    """Build a keep-alive session sized for concurrent page fetches."""
+    session = requests.Session()
+    # Zotero throttles with 429/503 and Retry-After; retry reads instead of aborting the run
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=3,
+        status=3,
+        backoff_factor=0.75,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _get_page(
+    session: requests.Session,
+    url: str,
+    api_key: str,
+    start: int,
+    params: Optional[Dict[str, str]] = None,
+) -> requests.Response:
+    # Zotero sorts by dateModified by default, so items written while a listing is
+    # being consumed would shift later offsets; dateAdded order is append-only
+    response = session.get(
+        url,
+        headers={"Zotero-API-Key": api_key},
+        params={"sort": "dateAdded", "direction": "asc", **(params or {}), "start": start, "limit": PAGE_SIZE},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response
+
+
+def iter_items(
+    session: requests.Session,
+    api_key: str,
+    path: str,
+    params: Optional[Dict[str, str]] = None,
+) -> Iterator[Dict]:
+    """
+    Yield every item of a paged Zotero listing such as `/groups/1/items`.
+
+    The first page reports `Total-Results`, so the remaining pages are fetched
+    concurrently. Without that header, `Link: rel="next"` is followed instead.
+    Pages are ordered by date added, so callers may write to items while iterating.
+    """
+    url = f"{API_BASE}{path}"
+    first_page = _get_page(session, url, api_key, 0, params)
+    yield from json_loads(first_page.content)
+
+    total = first_page.headers.get("Total-Results")
+    if total is None:
+        next_url = first_page.links.get("next", {}).get("url")
+        while next_url:
+            response = session.get(next_url, headers={"Zotero-API-Key": api_key}, timeout=30)
+            response.raise_for_status()
+            yield from json_loads(response.content)
+            next_url = response.links.get("next", {}).get("url")
+        return
+
+    offsets = range(PAGE_SIZE, int(total), PAGE_SIZE)
+    if not offsets:
+        return
+
+    LOGGER.info("Fetching %s more pages of %s", len(offsets), path)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        pages = executor.map(lambda start: _get_page(session, url, api_key, start, params), offsets)
+        for response in pages:
+            yield from json_loads(response.content)
+
+
+def iter_collection_items(
+    session: requests.Session,
+    api_key: str,
+    group: str,
+    coll: str,
+    params: Optional[Dict[str, str]] = None,
+) -> Iterator[Dict]:
+    """Yield every item in a group collection, optionally filtered by `params`."""
+    yield from iter_items(session, api_key, f"/groups/{group}/collections/{coll}/items", params)
+
+
+def create_items(
+    session: requests.Session,
+    api_key: str,
+    group: str,
+    items: List[Dict],
+) -> List[Optional[str]]:
+    """
+    Create up to WRITE_BATCH_SIZE items with a single multi-item write.
+
+    Returns the new item keys in input order, with None where creation failed.
+    """
+    keys: List[Optional[str]] = [None] * len(items)
+    response = session.post(
+        f"{API_BASE}/groups/{group}/items",
+        headers={
+            "Zotero-API-Key": api_key,
+            "Content-Type": "application/json",
+            "Zotero-Write-Token": uuid.uuid4().hex,
+        },
+        data=json_dumps(items),
+        timeout=30,
+    )
+    if response.status_code not in (200, 201):
+        LOGGER.error("Batch create failed: %s - %s", response.status_code, response.text)
+        return keys
+
+    payload = json_loads(response.content)
+    for index, created in payload.get("successful", {}).items():
+        keys[int(index)] = created.get("key")
+    for index, failure in payload.get("failed", {}).items():
+        LOGGER.error("Failed to create item %s: %s - %s", index, failure.get("code"), failure.get("message"))
+    return keys
+
+
+def update_items(
+    session: requests.Session,
+    api_key: str,
+    group: str,
+    items: List[Dict],
+) -> Dict[str, bool]:
+    """
+    Update up to WRITE_BATCH_SIZE existing items with a single multi-item write.
+
+    Each item must carry its `key` and `version`; Zotero applies every entry as
+    a PATCH. Returns a mapping of item key to whether the write succeeded.
+    """
+    results = {item["key"]: False for item in items}
+    response = session.post(
+        f"{API_BASE}/groups/{group}/items",
+        headers={
+            "Zotero-API-Key": api_key,
+            "Content-Type": "application/json",
+            "Zotero-Write-Token": uuid.uuid4().hex,
+        },
+        data=json_dumps(items),
+        timeout=30,
+    )
+    if response.status_code != 200:
+        LOGGER.error("Batch update failed: %s - %s", response.status_code, response.text)
+        return results
+
+    payload = json_loads(response.content)
+    for outcome in ("successful", "unchanged"):
+        for index in payload.get(outcome, {}):
+            results[items[int(index)]["key"]] = True
+    for index, failure in payload.get("failed", {}).items():
+        LOGGER.error(
+            "Failed to update %s: %s - %s",
+            items[int(index)]["key"],
+            failure.get("code"),
+            failure.get("message"),
+        )
+    return results
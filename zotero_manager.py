@@ -1,101 +1,113 @@
-import json
+import functools
 import logging
-import subprocess
-import tempfile
+import os
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from zotero_client import API_BASE, build_session, json_dumps, json_loads
 
 
 LOGGER = logging.getLogger(__name__)
 DEFAULT_ZOTERO_CONFIG = Path("~/.openclaw/workspace/.zotero-config.json").expanduser()
 
+# Shared across add_paper and add_paper_to_group calls so Zotero connections are kept alive
+_SESSION = build_session(pool_connections=8, pool_maxsize=16)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_zotero_config_cached(path_str: str, mtime: float) -> Dict:
+    # mtime is only part of the cache key, so edits to the file are picked up
+    return json_loads(Path(path_str).read_bytes())
+
 
 def _read_zotero_config(config_path: Optional[str] = None) -> Dict:
+    """Load the Zotero config, parsed once per file version. Treat the result as read-only."""
     path = Path(config_path).expanduser() if config_path else DEFAULT_ZOTERO_CONFIG
     if not path.exists():
         raise FileNotFoundError(f"Zotero config not found at {path}")
-    with path.open("r", encoding="utf-8") as config_file:
-        return json.load(config_file)
+    path_str = str(path.resolve())
+    return _read_zotero_config_cached(path_str, os.path.getmtime(path_str))
 
 
-def _base_command(config: Dict) -> List[str]:
-    command = ["zotero-cli"]
-
-    if config.get("api_key"):
-        command.extend(["--api-key", str(config["api_key"])])
-    if config.get("user_id"):
-        command.extend(["--user-id", str(config["user_id"])])
+def _library_path(config: Dict) -> str:
     if config.get("group_id"):
-        command.extend(["--group-id", str(config["group_id"])])
-    if config.get("config"):
-        command.extend(["--config", str(Path(config["config"]).expanduser())])
+        return f"/groups/{config['group_id']}"
+    if config.get("user_id"):
+        return f"/users/{config['user_id']}"
+    raise ValueError("Zotero config needs a group_id or user_id")
+
+
+def _create_item(config: Dict, library: str, payload: Dict) -> Optional[str]:
+    response = _SESSION.post(
+        f"{API_BASE}{library}/items",
+        headers={"Zotero-API-Key": str(config["api_key"]), "Content-Type": "application/json"},
+        data=json_dumps([payload]),
+        timeout=30,
+    )
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"Zotero item creation failed: {response.status_code} - {response.text.strip()}")
+
+    result = json_loads(response.content)
+    created = result.get("successful", {}).get("0", {})
+    if not created:
+        for failure in result.get("failed", {}).values():
+            LOGGER.error("Zotero rejected item: %s - %s", failure.get("code"), failure.get("message"))
+    return created.get("key")
+
 
-    return command
+@functools.lru_cache(maxsize=None)
+def _collection_keys(api_key: str, library: str) -> Dict[str, str]:
+    # One listing per library per process; errors raise so they are not cached
+    keys: Dict[str, str] = {}
+    url = f"{API_BASE}{library}/collections"
+    params = {"limit": 100}
+    while url:
+        response = _SESSION.get(url, headers={"Zotero-API-Key": api_key}, params=params, timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f"Could not list collections ({response.status_code})")
 
+        for collection in json_loads(response.content):
+            data = collection.get("data", {})
+            keys.setdefault(data.get("name"), data.get("key"))
 
-def _run_command(command: List[str]) -> str:
-    LOGGER.info("Running command: %s", " ".join(command))
-    completed = subprocess.run(command, capture_output=True, text=True, check=False)
-    if completed.returncode != 0:
-        raise RuntimeError(f"zotero-cli failed: {completed.stderr.strip() or completed.stdout.strip()}")
-    return completed.stdout.strip()
+        # The next link already carries the paging parameters
+        url = response.links.get("next", {}).get("url")
+        params = None
+    return keys
 
 
 def _resolve_collection_key(config: Dict, collection_name: Optional[str]) -> Optional[str]:
     if not collection_name:
         return None
 
-    command = _base_command(config) + ["collections"]
-    output = _run_command(command)
     try:
-        collections = json.loads(output)
-    except json.JSONDecodeError:
-        LOGGER.warning("Could not decode collections output; skipping collection assignment")
+        keys = _collection_keys(str(config["api_key"]), _library_path(config))
+    except RuntimeError as error:
+        LOGGER.warning("%s; skipping collection assignment", error)
         return None
 
-    for collection in collections:
-        data = collection.get("data", {})
-        if data.get("name") == collection_name:
-            return data.get("key")
+    if collection_name in keys:
+        return keys[collection_name]
 
     LOGGER.warning("Collection '%s' not found in Zotero library", collection_name)
     return None
 
 
-def _extract_item_key(create_output: str) -> Optional[str]:
-    try:
-        payload = json.loads(create_output)
-    except json.JSONDecodeError:
-        return None
-
-    successful = payload.get("successful", {}) if isinstance(payload, dict) else {}
-    for value in successful.values():
-        key = value.get("key")
-        if key:
-            return key
-
-    if isinstance(payload, list) and payload:
-        candidate = payload[0]
-        if isinstance(candidate, dict):
-            return candidate.get("key")
-    return None
+@functools.lru_cache(maxsize=4096)
+def _author_to_creator(author: str) -> Tuple[Tuple[str, str], ...]:
+    # Frozen so cached entries cannot be mutated through a returned creator dict
+    parts = author.split()
+    if len(parts) == 1:
+        return (("creatorType", "author"), ("name", parts[0]))
+    return (
+        ("creatorType", "author"),
+        ("firstName", " ".join(parts[:-1])),
+        ("lastName", parts[-1]),
+    )
 
 
 def _author_creators(authors: List[str]) -> List[Dict[str, str]]:
-    creators = []
-    for author in authors:
-        parts = [part for part in author.strip().split(" ") if part]
-        if len(parts) == 1:
-            creators.append({"creatorType": "author", "name": parts[0]})
-        elif len(parts) > 1:
-            creators.append(
-                {
-                    "creatorType": "author",
-                    "firstName": " ".join(parts[:-1]),
-                    "lastName": parts[-1],
-                }
-            )
-    return creators
+    return [dict(_author_to_creator(author)) for author in authors if author.strip()]
 
 
 def add_paper(
@@ -109,6 +121,7 @@ def add_paper(
     Returns the Zotero item key when successful, otherwise None.
     """
     config = _read_zotero_config(zotero_config_path)
+    library = _library_path(config)
     collection_key = _resolve_collection_key(config, metadata_dict.get("collection_name"))
 
     item_payload = {
@@ -136,17 +149,7 @@ def add_paper(
     if collection_key:
         item_payload["collections"] = [collection_key]
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False, encoding="utf-8") as tmp_file:
-        json.dump([item_payload], tmp_file)
-        temp_path = tmp_file.name
-
-    command = _base_command(config) + ["create-item", temp_path]
-    try:
-        output = _run_command(command)
-    finally:
-        Path(temp_path).unlink(missing_ok=True)
-
-    item_key = _extract_item_key(output)
+    item_key = _create_item(config, library, item_payload)
     if not item_key:
         LOGGER.error("Failed to parse created Zotero item key")
         return None
@@ -164,27 +167,18 @@ def add_paper(
                 "path": pdf.resolve().as_uri(),
                 "contentType": "application/pdf",
             }
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False, encoding="utf-8") as tmp_file:
-                json.dump([attachment_payload], tmp_file)
-                attachment_temp_path = tmp_file.name
-
-            attach_command = _base_command(config) + ["create-item", attachment_temp_path]
             try:
-                _run_command(attach_command)
-                LOGGER.info("Attached PDF to item %s", item_key)
+                if _create_item(config, library, attachment_payload):
+                    LOGGER.info("Attached PDF to item %s", item_key)
+                else:
+                    LOGGER.warning("Failed to attach PDF to %s", item_key)
             except Exception as error:
                 LOGGER.warning("Failed to attach PDF to %s: %s", item_key, error)
-            finally:
-                Path(attachment_temp_path).unlink(missing_ok=True)
 
     return item_key
 
 def add_paper_to_group(metadata_dict, pdf_path=None, group_id="5120604", config_path=None):
     """Add paper to CLESSN group library with proper metadata formatting"""
-    import os
-    import re
-    import requests
-    
     config = _read_zotero_config(config_path)
     api_key = config["api_key"]
     
@@ -201,13 +195,13 @@ def add_paper_to_group(metadata_dict, pdf_path=None, group_id="5120604", config_
     }
     
     # POST to Zotero API
-    response = requests.post(
+    response = _SESSION.post(
         f"https://api.zotero.org/groups/{group_id}/items",
         headers={
             "Zotero-API-Key": api_key,
             "Content-Type": "application/json"
         },
-        json=[item_data]
+        data=json_dumps([item_data])
     )
     
     if response.status_code not in (200, 201):
@@ -215,7 +209,7 @@ def add_paper_to_group(metadata_dict, pdf_path=None, group_id="5120604", config_
         return None
     
     # Extract item key
-    result = response.json()
+    result = json_loads(response.content)
     item_key = result.get("successful", {}).get("0", {}).get("key")
     
     if not item_key:
@@ -228,10 +222,6 @@ def add_paper_to_group(metadata_dict, pdf_path=None, group_id="5120604", config_
     if pdf_path and os.path.exists(pdf_path):
         pdf_file = Path(pdf_path)
         
-        # Upload file attachment
-        with open(pdf_file, 'rb') as f:
-            pdf_data = f.read()
-        
         # Create attachment item
         attach_data = {
             "itemType": "attachment",
@@ -242,30 +232,31 @@ def add_paper_to_group(metadata_dict, pdf_path=None, group_id="5120604", config_
         }
         
         # Register attachment
-        response_attach = requests.post(
+        response_attach = _SESSION.post(
             f"https://api.zotero.org/groups/{group_id}/items",
             headers={
                 "Zotero-API-Key": api_key,
                 "Content-Type": "application/json"
             },
-            json=[attach_data]
+            data=json_dumps([attach_data])
         )
         
         if response_attach.status_code in (200, 201):
-            result_attach = response_attach.json()
+            result_attach = json_loads(response_attach.content)
             attach_key = result_attach.get("successful", {}).get("0", {}).get("key")
             
             if attach_key:
-                # Upload actual file content
-                response_upload = requests.post(
-                    f"https://api.zotero.org/groups/{group_id}/items/{attach_key}/file",
-                    headers={
-                        "Zotero-API-Key": api_key,
-                        "Content-Type": "application/pdf",
-                        "If-None-Match": "*"
-                    },
-                    data=pdf_data
-                )
+                # Upload actual file content, streamed from the open file
+                with open(pdf_file, 'rb') as f:
+                    response_upload = _SESSION.post(
+                        f"https://api.zotero.org/groups/{group_id}/items/{attach_key}/file",
+                        headers={
+                            "Zotero-API-Key": api_key,
+                            "Content-Type": "application/pdf",
+                            "If-None-Match": "*"
+                        },
+                        data=f
+                    )
                 
                 if response_upload.status_code == 204:
                     LOGGER.info(f"📎 Attached PDF to item {item_key}")